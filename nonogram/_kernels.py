@@ -0,0 +1,151 @@
+""" Optional Numba-compiled kernels for the line enumeration hot path """
+
+from typing import Sequence, Tuple
+
+try:
+    import numpy as np
+    from numba import njit
+except ImportError:  # Numba (and NumPy) are optional
+    np = None  # type: ignore[assignment]
+    njit = None  # type: ignore[assignment]
+
+HAVE_NUMBA = njit is not None
+
+# Masks are held in int64 words; staying below the sign bit keeps every
+# operand signed so Numba never promotes a mixed int64/uint64 op to float.
+MAX_KERNEL_LENGTH = 62
+
+# Capacity of the reusable pattern buffer of `kernel_patterns`.
+MAX_PATTERNS = 1 << 16
+
+
+if HAVE_NUMBA:
+
+    @njit(cache=True)
+    def enumerate_patterns(length, runs, filled_mask, empty_mask, out_buf):
+        """
+        Visit every pattern consistent with `runs` and the known masks,
+        folding them into a running AND / OR. Returns
+        (count, and_mask, or_mask); and_mask is -1 if no pattern fits.
+
+        The first len(out_buf) patterns are also written into `out_buf`
+        (int64[:]); if count exceeds its size the caller should retry with a
+        larger buffer. Pass a zero-length buffer to only fold; folding then
+        stops as soon as AND is 0 and OR is full (count is partial).
+
+        Same placement rules as `_enumerate_line_patterns`, with the
+        recursion unrolled onto explicit per-run stacks.
+        """
+        k = runs.shape[0]
+        capacity = out_buf.shape[0]
+
+        if k == 0:
+            if filled_mask != 0:
+                return 0, -1, 0
+            if capacity > 0:
+                out_buf[0] = 0
+            return 1, 0, 0
+
+        # Farthest start of each run so that it and all later runs still fit
+        max_start = np.empty(k, np.int64)
+        remaining = -1
+        for i in range(k - 1, -1, -1):
+            remaining += runs[i] + 1
+            max_start[i] = length - remaining
+
+        pos = np.empty(k, np.int64)       # next trial start of run i
+        acc = np.empty(k + 1, np.int64)   # blocks of runs 0..i-1
+        pos[0] = 0
+        acc[0] = 0
+
+        full_mask = (1 << length) - 1
+        count = 0
+        and_mask = -1
+        or_mask = 0
+        i = 0
+        while i >= 0:
+            p = pos[i]
+            descended = False
+            while p <= max_start[i]:
+                # Known 1s before the block left uncovered: no later start helps
+                if filled_mask & ~acc[i] & ((1 << p) - 1):
+                    break
+
+                bm = ((1 << runs[i]) - 1) << p
+                conflict = bm & empty_mask
+                if conflict != 0:
+                    # Jump just past the rightmost known 0 inside the block
+                    q = p + runs[i] - 1
+                    while (conflict >> q) & 1 == 0:
+                        q -= 1
+                    p = q + 1
+                    continue
+
+                m = acc[i] | bm
+                if i == k - 1:
+                    if filled_mask & ~m == 0:
+                        if count < capacity:
+                            out_buf[count] = m
+                        count += 1
+                        and_mask &= m
+                        or_mask |= m
+                        if capacity == 0 and and_mask == 0 and or_mask == full_mask:
+                            # Saturated: no further pattern can force a cell
+                            return count, and_mask, or_mask
+                else:
+                    pos[i] = p + 1
+                    acc[i + 1] = m
+                    pos[i + 1] = p + runs[i] + 1
+                    i += 1
+                    descended = True
+                    break
+                p += 1
+
+            if not descended:
+                i -= 1
+
+        return count, and_mask, or_mask
+
+
+# Scratch buffer reused by `kernel_patterns`. It never grows: a line with
+# more patterns gets an exactly-sized array for that call only.
+_scratch = np.empty(MAX_PATTERNS, dtype=np.int64) if HAVE_NUMBA else None
+
+# Zero-length buffer: `enumerate_patterns` only folds, storing nothing.
+_NO_BUFFER = np.empty(0, dtype=np.int64) if HAVE_NUMBA else None
+
+
+def kernel_patterns(length: int, runs: Sequence[int],
+                    filled_mask: int, empty_mask: int):
+    """
+    Compiled equivalent of `_enumerate_line_patterns`, materialized as an
+    int64 array. Requires HAVE_NUMBA and length <= MAX_KERNEL_LENGTH.
+    """
+    assert _scratch is not None, "kernel_patterns requires Numba"
+    runs_arr = np.asarray(runs, dtype=np.int64)
+    count, _, _ = enumerate_patterns(length, runs_arr, filled_mask, empty_mask, _scratch)
+    if count <= MAX_PATTERNS:
+        return _scratch[:count].copy()
+
+    out_buf = np.empty(count, dtype=np.int64)
+    enumerate_patterns(length, runs_arr, filled_mask, empty_mask, out_buf)
+    return out_buf
+
+
+def kernel_deduce(length: int, runs: Sequence[int],
+                  filled_mask: int, empty_mask: int) -> Tuple[int, int]:
+    """
+    Compiled equivalent of the enumerate-and-intersect step: returns
+    (must_fill_mask, must_empty_mask), or (0, 0) if no pattern fits.
+    Folds AND / OR inside the kernel, so no pattern is stored.
+    Requires HAVE_NUMBA and length <= MAX_KERNEL_LENGTH.
+    """
+    runs_arr = np.asarray(runs, dtype=np.int64)
+    count, and_mask, or_mask = enumerate_patterns(
+        length, runs_arr, filled_mask, empty_mask, _NO_BUFFER
+    )
+    if count == 0:
+        return 0, 0
+
+    full_mask = (1 << length) - 1
+    return int(and_mask) & full_mask, ~int(or_mask) & full_mask
@@ -1,5 +1,5 @@
-from dataclasses import dataclass
-from typing import List
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Tuple
 
 
 @dataclass
@@ -11,11 +11,57 @@ class NonogramPuzzle:
     ----------
     size : int
         Size of the puzzle grid (assumed square: size x size).
-    rows : List[List[int]]
-        Row clues. Each entry is a list of run lengths (left → right).
-    cols : List[List[int]]
-        Column clues. Each entry is a list of run lengths (top → bottom).
+    rows : Sequence[Sequence[int]]
+        Row clues. Each entry is a sequence of run lengths (left → right).
+    cols : Sequence[Sequence[int]]
+        Column clues. Each entry is a sequence of run lengths (top → bottom).
+        Both accept any sequences of sequences; they are converted to
+        tuples on construction, with equal clues sharing one tuple, so runs
+        can be used directly as cache keys.
+    row_forced : List[int]
+        Derived: per-row bitmask of cells forced filled by overlap (bit c = col c).
+    col_forced : List[int]
+        Derived: per-column bitmask of cells forced filled by overlap (bit r = row r).
     """
     size: int
-    rows: List[List[int]]
-    cols: List[List[int]]
+    rows: Sequence[Sequence[int]]
+    cols: Sequence[Sequence[int]]
+    row_forced: List[int] = field(init=False, repr=False, compare=False)
+    col_forced: List[int] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        # Imported here: the strategies package depends on this module
+        from nonogram.strategies.overlap import overlap_fill_line
+
+        shared: Dict[Tuple[int, ...], Tuple[int, ...]] = {}
+        self.rows = tuple(shared.setdefault(tuple(runs), tuple(runs)) for runs in self.rows)
+        self.cols = tuple(shared.setdefault(tuple(runs), tuple(runs)) for runs in self.cols)
+
+        self.row_forced = [overlap_fill_line(self.size, runs) for runs in self.rows]
+        self.col_forced = [overlap_fill_line(self.size, runs) for runs in self.cols]
+
+
+@dataclass
+class LineState:
+    """
+    Bitmask view of a single line (row or column) of the working grid.
+
+    Bit i corresponds to cell i: left → right for rows, top → bottom for cols.
+
+    Attributes
+    ----------
+    filled_mask : int
+        Cells known to be filled (1).
+    empty_mask : int
+        Cells known to be empty (0). Disjoint from `filled_mask`.
+    length : int
+        Number of cells in the line.
+    """
+    filled_mask: int
+    empty_mask: int
+    length: int
+
+    @property
+    def unknown_mask(self) -> int:
+        """Cells that are still unknown (-1)."""
+        return ((1 << self.length) - 1) & ~(self.filled_mask | self.empty_mask)
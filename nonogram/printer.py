@@ -1,5 +1,8 @@
+from itertools import repeat
 from typing import List
 
+_SYMBOLS = {1: "█", 0: " ", -1: "·"}
+
 
 def print_grid(grid: List[List[int]]) -> None:
     """
@@ -8,6 +11,5 @@ def print_grid(grid: List[List[int]]) -> None:
       '·' = unknown (-1)
       ' ' = empty (0)  # we won't set empties in this first pass
     """
-    symbols = {1: "█", 0: " ", -1: "·"}
     for row in grid:
-        print("".join(symbols.get(v, "?") for v in row))
\ No newline at end of file
+        print("".join(map(_SYMBOLS.get, row, repeat("?"))))
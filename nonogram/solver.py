@@ -1,47 +1,64 @@
 from typing import List, Optional
 
 from nonogram.dto import NonogramPuzzle
+from nonogram.state import GridState
 from nonogram.strategies.overlap import apply_overlap_pass
-from nonogram.strategies.possibilities import deduce_from_possibilities
-from nonogram.validator import is_puzzle_solved
+from nonogram.strategies.possibilities import (
+    clear_possibility_cache,
+    deduce_from_possibilities,
+)
+from nonogram.validator import does_mask_satisfy_clues
 
 
-def apply_possibility_pass(puzzle: NonogramPuzzle, grid: List[List[int]]) -> bool:
+def apply_possibility_pass(puzzle: NonogramPuzzle, state: GridState) -> bool:
     """
-    For each row/column, enumerate consistent patterns and intersect them.
+    For each dirty row/column (some cell changed since it was last processed),
+    enumerate consistent patterns and intersect them.
     Marks must-fill (1) and must-empty (0). Returns True if anything changed.
     """
     changed = False
 
     # Rows
-    for r in range(puzzle.size):
-        known = grid[r]
-        mf, me = deduce_from_possibilities(puzzle.size, puzzle.rows[r], known)
-        for c in mf:
-            if grid[r][c] != 1:
-                grid[r][c] = 1
-                changed = True
-        for c in me:
-            if grid[r][c] != 0:
-                grid[r][c] = 0
-                changed = True
-    
+    for r in state.take_dirty_rows():
+        line = state.row(r)
+        if not line.unknown_mask:
+            continue  # Nothing left to deduce
+        mf, me = deduce_from_possibilities(puzzle.rows[r], line)
+        if state.mark_row(r, mf, me):
+            changed = True
+            # Re-deducing a line from its own result adds nothing
+            state.dirty_rows.discard(r)
+
     # Columns
-    for c in range(puzzle.size):
-        known = [grid[i][c] for i in range(puzzle.size)]
-        mf, me = deduce_from_possibilities(puzzle.size, puzzle.cols[c], known)
-        for i in mf:
-            if grid[i][c] != 1:
-                grid[i][c] = 1
-                changed = True
-        for i in me:
-            if grid[i][c] != 0:
-                grid[i][c] = 0
-                changed = True
-    
+    for c in state.take_dirty_cols():
+        line = state.col(c)
+        if not line.unknown_mask:
+            continue
+        mf, me = deduce_from_possibilities(puzzle.cols[c], line)
+        if state.mark_col(c, mf, me):
+            changed = True
+            state.dirty_cols.discard(c)
+
     return changed
 
 
+def validate_completed_lines(puzzle: NonogramPuzzle, state: GridState) -> bool:
+    """
+    Check every line that became fully known since the last call against its
+    clues. Returns False if any of them fails (the puzzle has no solution).
+    """
+    ok = True
+    for r in state.rows_to_validate:
+        if not does_mask_satisfy_clues(state.row_filled[r], puzzle.rows[r]):
+            ok = False
+    for c in state.cols_to_validate:
+        if not does_mask_satisfy_clues(state.col_filled[c], puzzle.cols[c]):
+            ok = False
+    state.rows_to_validate.clear()
+    state.cols_to_validate.clear()
+    return ok
+
+
 def solve_nonogram(puzzle: NonogramPuzzle) -> Optional[List[List[int]]]:
     """
     Solve a given Nonogram puzzle.
@@ -62,20 +79,27 @@ def solve_nonogram(puzzle: NonogramPuzzle) -> Optional[List[List[int]]]:
     - Uses constraint propagation (line deductions) and may fall back to
       backtracking if needed.
     """
-    # Working grid: -1 unknown, 0 empty, 1 filled
-    state = [[-1] * puzzle.size for _ in range(puzzle.size)]
+    # Line deductions are memoized per puzzle
+    clear_possibility_cache()
+
+    # Working state: per-line filled/empty bitmasks, mirrored on rows and cols
+    state = GridState(puzzle.size)
+
+    # Overlap only depends on the clues: one pass is enough
+    apply_overlap_pass(puzzle, state)
 
-    changed = True
-    while changed:
-        if is_puzzle_solved(puzzle, state):
+    # Worklist: keep deducing until no line is dirty
+    while True:
+        if not validate_completed_lines(puzzle, state):
+            print("Puzzle solved: False")
+            return None
+        if state.is_complete() or not (state.dirty_rows or state.dirty_cols):
             break
 
-        changed = False
-        if apply_overlap_pass(puzzle, state):
-            changed = True
-        if apply_possibility_pass(puzzle, state):
-            changed = True
-    
-    print(f"Puzzle solved: {is_puzzle_solved(puzzle, state)}")
+        apply_possibility_pass(puzzle, state)
+
+    # Every completed line has been validated, so complete means solved
+    print(f"Puzzle solved: {state.is_complete()}")
 
-    return state
+    # Back to -1 unknown, 0 empty, 1 filled
+    return state.to_grid()
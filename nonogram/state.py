@@ -0,0 +1,136 @@
+""" This module holds the bitmask working state used by the solver """
+
+from typing import Iterator, List, Set
+
+from nonogram.dto import LineState
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """
+    Yield the indices of the set bits of `mask`, lowest first.
+    Example: 0b10110 -> 1, 2, 4
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class GridState:
+    """
+    Working grid stored as per-line bitmasks, mirrored on both axes.
+
+    For every row r and column c:
+      row_filled[r] bit c == col_filled[c] bit r == cell (r, c) is filled (1)
+      row_empty[r]  bit c == col_empty[c]  bit r == cell (r, c) is empty (0)
+    A cell present in neither mask is unknown (-1).
+
+    The column masks are the transposed shadow of the row masks: every write
+    goes through `set_cell`, which updates both axes, so a row or column
+    query is a single list lookup.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self.full_mask = (1 << size) - 1
+        self.row_filled = [0] * size
+        self.row_empty = [0] * size
+        self.col_filled = [0] * size
+        self.col_empty = [0] * size
+
+        # Unknown cells left, overall and per line; lines that reach zero are
+        # queued so the solver validates only those against their clues.
+        self.unknown_count = size * size
+        self.row_unknown = [size] * size
+        self.col_unknown = [size] * size
+        self.rows_to_validate: Set[int] = set()
+        self.cols_to_validate: Set[int] = set()
+
+        # Lines with a cell changed since they were last processed; every
+        # line starts dirty so the first pass looks at all of them.
+        self.dirty_rows: Set[int] = set(range(size))
+        self.dirty_cols: Set[int] = set(range(size))
+
+    def row(self, r: int) -> LineState:
+        """Current knowledge of row r (bit c = column c)."""
+        return LineState(self.row_filled[r], self.row_empty[r], self.size)
+
+    def col(self, c: int) -> LineState:
+        """Current knowledge of column c (bit r = row r)."""
+        return LineState(self.col_filled[c], self.col_empty[c], self.size)
+
+    def set_cell(self, r: int, c: int, v: int) -> None:
+        """
+        Write unknown cell (r, c) as filled (v=1) or empty (v=0) on both axes.
+        Every change to the state goes through here.
+        """
+        if v == 1:
+            self.row_filled[r] |= 1 << c
+            self.col_filled[c] |= 1 << r
+        else:
+            self.row_empty[r] |= 1 << c
+            self.col_empty[c] |= 1 << r
+
+        self.dirty_rows.add(r)
+        self.dirty_cols.add(c)
+
+        self.unknown_count -= 1
+        self.row_unknown[r] -= 1
+        if not self.row_unknown[r]:
+            self.rows_to_validate.add(r)
+        self.col_unknown[c] -= 1
+        if not self.col_unknown[c]:
+            self.cols_to_validate.add(c)
+
+    def mark_row(self, r: int, fill_mask: int, empty_mask: int) -> bool:
+        """
+        Mark cells of row r as filled / empty. Only unknown cells are written.
+        Returns True if any cell changed.
+        """
+        unknown = self.full_mask & ~(self.row_filled[r] | self.row_empty[r])
+        new_fill = fill_mask & unknown
+        new_empty = empty_mask & unknown
+        for c in iter_bits(new_fill):
+            self.set_cell(r, c, 1)
+        for c in iter_bits(new_empty):
+            self.set_cell(r, c, 0)
+        return bool(new_fill or new_empty)
+
+    def mark_col(self, c: int, fill_mask: int, empty_mask: int) -> bool:
+        """
+        Mark cells of column c as filled / empty. Only unknown cells are written.
+        Returns True if any cell changed.
+        """
+        unknown = self.full_mask & ~(self.col_filled[c] | self.col_empty[c])
+        new_fill = fill_mask & unknown
+        new_empty = empty_mask & unknown
+        for r in iter_bits(new_fill):
+            self.set_cell(r, c, 1)
+        for r in iter_bits(new_empty):
+            self.set_cell(r, c, 0)
+        return bool(new_fill or new_empty)
+
+    def take_dirty_rows(self) -> Set[int]:
+        """Return the dirty rows and reset the set."""
+        rows, self.dirty_rows = self.dirty_rows, set()
+        return rows
+
+    def take_dirty_cols(self) -> Set[int]:
+        """Return the dirty columns and reset the set."""
+        cols, self.dirty_cols = self.dirty_cols, set()
+        return cols
+
+    def is_complete(self) -> bool:
+        """No unknowns anywhere."""
+        return self.unknown_count == 0
+
+    def to_grid(self) -> List[List[int]]:
+        """Translate back to the list-of-lists grid: -1 unknown, 0 empty, 1 filled."""
+        grid = []
+        for r in range(self.size):
+            filled, empty = self.row_filled[r], self.row_empty[r]
+            grid.append([
+                1 if filled >> c & 1 else 0 if empty >> c & 1 else -1
+                for c in range(self.size)
+            ])
+        return grid
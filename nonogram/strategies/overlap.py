@@ -1,27 +1,28 @@
 """ This module handless the overlap pass for the nanogram puzzle """
 
-from typing import List
+from typing import Sequence
 
 from nonogram.dto import NonogramPuzzle
+from nonogram.state import GridState
 
 
-def overlap_fill_line(length: int, runs: List[int]) -> List[int]:
+def overlap_fill_line(length: int, runs: Sequence[int]) -> int:
     """
-    Compute the indices that are guaranteed filled for a single line using
+    Compute the cells that are guaranteed filled for a single line using
     the classic "overlap/core fill" logic (ignores any prior cell knowledge).
 
     Parameters
     ----------
     length : int
         Number of cells in the line.
-    runs : List[int]
-        Ordered run lengths for the line. Example: [3,1].
+    runs : Sequence[int]
+        Ordered run lengths for the line. Example: (3, 1).
 
     Returns
     -------
-    List[int]
-        Sorted unique indices (0-based) that must be filled.
-        Empty if no overlap forces any cell.
+    int
+        Bitmask of the cells that must be filled (bit i = cell i).
+        0 if no overlap forces any cell.
 
     Notes
     -----
@@ -33,91 +34,73 @@ def overlap_fill_line(length: int, runs: List[int]) -> List[int]:
       If OL[i] > 0, the forced block is the intersection region between
       the earliest end (E[i]+runs[i]-1) and the latest start (Lmax[i]),
       which yields the contiguous indices [Lmax[i], E[i]+runs[i]-1].
+    Since Lmax[i] = E[i] + S, each block is built directly as a shifted mask
+    of OL[i] ones; blocks of different runs are disjoint.
     """
 
     if not runs:
-        return []
-    
+        return 0
+
     k = len(runs)
     req = sum(runs) + (k - 1)
     S = length - req # slack
     if S < 0:
         # Impossible line
-        return []
-
-    # prefix sums of runs for fast range sums
-    pref = [0] * (k + 1)
-    for i in range(1, k + 1):
-        pref[i] = pref[i - 1] + runs[i - 1]
-    
-    forced: List[int] = []
-
-    for i in range(k):
-        r = runs[i]
-        overlap_len = r - S
-        if overlap_len <= 0:
-            continue # No overlap cells
+        return 0
 
-        # Earliest start for run i (accounting for i gaps before it) - push everything as far left as possible
-        earliest_start = pref[i] + i
+    forced = 0
 
-        # Latest start for run i - push everythong as far right as possible
-        # sum(runs[i...k-1]) = pref[k] - pref[i]
-        # gaps after i = (k-1 - i)
-        latest_start = length - ((pref[k] - pref[i]) + (k - 1 - i))
+    # Earliest start for run i (accounting for i gaps before it) - push everything as far left as possible
+    earliest_start = 0
 
-        # Run i can slide between earliesst_start and latest_start (The slack S)
-
-        # Forced blocks runs from latest_start .. (earliest_start + r - 1)
-        start = latest_start
-        end = earliest_start + r - 1
+    for r in runs:
+        # Run can slide by the slack S: latest start = earliest_start + S.
+        # Forced block runs from latest start .. (earliest_start + r - 1),
+        # i.e. overlap_len = r - S cells
+        overlap_len = r - S
+        if overlap_len > 0:
+            forced |= ((1 << overlap_len) - 1) << (earliest_start + S)
 
-        if start <= end:
-            forced.extend(range(start, end + 1))
-    
+        earliest_start += r + 1
 
-    return sorted(set(forced))
+    return forced
 
 
-def apply_overlap_pass(puzzle: NonogramPuzzle, grid: List[List[int]]) -> bool:
+def apply_overlap_pass(puzzle: NonogramPuzzle, state: GridState) -> bool:
     """
     Apply one global "overlap/core fill" pass to all rows and columns.
     Only marks cells as filled (1) when forced by overlap; does NOT mark empties.
+    The forced masks depend only on the clues and are precomputed on the
+    puzzle (`row_forced` / `col_forced`).
 
     Parameters
     ----------
     puzzle : NonogramPuzzle
         The puzzle definition.
-    grid : List[List[int]]
-        Mutable working grid: -1 unknown, 0 empty, 1 filled.
+    state : GridState
+        Mutable working state (per-line filled/empty bitmasks).
 
     Returns
     -------
     bool
-        True if the grid was changed (some new cells filled), False otherwise.
+        True if the state was changed (some new cells filled), False otherwise.
 
     Mapping
     -------
-    - Rows: left → right index mapping is (row=r, col=c).
-    - Cols: top → bottom index mapping is (row=i, col=c) for index i in that column.
+    - Rows: bit c of the row mask is column c (left → right).
+    - Cols: bit i of the column mask is row i (top → bottom).
     """
     changed = False
     N = puzzle.size
 
     # Rows
     for r in range(N):
-        forced = overlap_fill_line(N, puzzle.rows[r])
-        for c in forced:
-            if grid[r][c] == -1:
-                grid[r][c] = 1
-                changed = True
-    
+        if state.mark_row(r, puzzle.row_forced[r], 0):
+            changed = True
+
     # Columns
     for c in range(N):
-        forced = overlap_fill_line(N, puzzle.cols[c])
-        for i in forced:
-            if grid[i][c] == -1:
-                grid[i][c] = 1
-                changed = True
-    
-    return changed
\ No newline at end of file
+        if state.mark_col(c, puzzle.col_forced[c], 0):
+            changed = True
+
+    return changed
@@ -1,4 +1,8 @@
-from typing import List, Iterable, Tuple
+from functools import lru_cache
+from typing import Iterator, List, Sequence, Tuple
+
+from nonogram._kernels import HAVE_NUMBA, MAX_KERNEL_LENGTH, kernel_deduce, kernel_patterns
+from nonogram.dto import LineState
 
 
 def generate_line_possibilities(
@@ -70,139 +74,178 @@ def generate_line_possibilities(
     >>> generate_line_possibilities(5, [], 0b00001, 0)
     []
     """
-    pass
+    if HAVE_NUMBA and length <= MAX_KERNEL_LENGTH:
+        return kernel_patterns(length, runs, known_filled_mask, known_empty_mask).tolist()
+    return list(_enumerate_line_patterns(length, runs, known_filled_mask, known_empty_mask))
+
+
+def _suffix_requirements(runs: Sequence[int]) -> List[int]:
+    """
+    suffix_req[i] = cells needed by runs[i:] packed with single gaps,
+    i.e. sum(runs[i:]) + (k - 1 - i); suffix_req[k] = 0.
+    """
+    k = len(runs)
+    suffix_req = [0] * (k + 1)
+    for i in range(k - 1, -1, -1):
+        suffix_req[i] = suffix_req[i + 1] + runs[i] + (1 if i < k - 1 else 0)
+    return suffix_req
 
 
-def _enumerate_line_patterns(length: int, runs: List[int],
-                             known: List[int]) -> Iterable[List[int]]:
+def _enumerate_line_patterns(length: int, runs: Sequence[int],
+                             filled_mask: int, empty_mask: int) -> Iterator[int]:
     """
-    Generate all 0/1 patterns of size `length` that satisfy `runs` and are
-    consistent with `known`:
-      known[i] ==  1 → cell i must be filled
-      known[i] ==  0 → cell i must be empty
-      known[i] == -1 → unknown (no constraint)
+    Generate all patterns of size `length` (as bitmasks, bit i = cell i) that
+    satisfy `runs` and are consistent with the known cells:
+      bit i of filled_mask → cell i must be filled
+      bit i of empty_mask  → cell i must be empty
 
     Yields
     ------
-    pattern : List[int]
-        A valid 0/1 line.
+    pattern : int
+        A valid line; bit i = 1 means cell i is filled.
     """
 
     # Early infeasibility checks
     if not runs:
-        if all(k in (0, -1) for k in known):
-            yield [0] * length
+        if not filled_mask:
+            yield 0
         return
 
     len_runs = len(runs)
-    sum_runs = sum(runs)
-
-    def ok_block(start: int, size: int) -> bool:
-        """Block [start, start+size) must contain no known-0, and any known-1 within must be inside."""
-        if start < 0 or start + size > length:
-            return False
-        for i in range(start, start + size):
-            if known[i] == 0:
-                return False
-        return True
-    
-    def consistent_fill(line: List[int]) -> bool:
-        """Check line against known constraints quickly."""
-        return all(known[i] == -1 or known[i] == line[i] for i in range(length))
-    
-    line = [0] * length
-    
-    def place(run_idx: int, pos: int) -> Iterable[List[int]]:
+    suffix_req = _suffix_requirements(runs)
+
+    def place(run_idx: int, pos: int, acc_mask: int) -> Iterator[int]:
         """
         Try to place run `run_idx` starting from search cursor `pos`.
-        `pos` is the first index we are allowed to try placing the run at.
+        `pos` is the first index we are allowed to try placing the run at;
+        `acc_mask` holds the blocks of the runs placed so far.
         """
         run = runs[run_idx]
+        block = (1 << run) - 1
+        last = run_idx + 1 == len_runs
+        # The farthest start so that this run and all remaining runs fit:
+        max_start = length - suffix_req[run_idx]
+
+        position = pos
+        while position <= max_start:
+            # Every known 1 before this block must already be covered; moving
+            # further right can only leave more of them uncovered.
+            if filled_mask & ~acc_mask & ((1 << position) - 1):
+                return
+
+            bm = block << position
+            conflict = bm & empty_mask
+            if conflict:
+                # Every start up to the rightmost known 0 in the block still
+                # covers it: jump just past it.
+                position = conflict.bit_length()
+                continue
+
+            mask = acc_mask | bm
+            if last:
+                # Known 1s after the last block would be left empty
+                if not filled_mask & ~mask:
+                    yield mask
+            else:
+                # The gap cell (position + run) is checked by the prefix
+                # test of the next run.
+                yield from place(run_idx + 1, position + run + 1, mask)
+
+            position += 1
+
+    yield from place(0, 0, 0)
+
+
+def _fold_line_patterns(length: int, runs: Sequence[int],
+                        filled_mask: int, empty_mask: int) -> Tuple[int, int]:
+    """
+    Push-style twin of `_enumerate_line_patterns`: instead of yielding each
+    pattern, thread the running AND / OR of the patterns through the
+    recursion and return (and_of_all, or_of_all).
+
+    Enumeration stops as soon as AND is 0 and OR is full, since no further
+    pattern can force a cell. If no pattern fits, returns (-1, 0).
+    """
+    full_mask = (1 << length) - 1
+
+    if not runs:
+        return (0, 0) if not filled_mask else (-1, 0)
+
+    len_runs = len(runs)
+    suffix_req = _suffix_requirements(runs)
+
+    def place(run_idx: int, pos: int, acc_mask: int, a: int, o: int) -> Tuple[int, int]:
+        """Same placement rules as in `_enumerate_line_patterns`."""
+        run = runs[run_idx]
+        block = (1 << run) - 1
+        last = run_idx + 1 == len_runs
         # The farthest start so that this run and all remaining runs fit:
-        remaining = sum(runs[run_idx:]) + (len(runs) - 1 - run_idx)
-        max_start = length - remaining
+        max_start = length - suffix_req[run_idx]
 
         position = pos
         while position <= max_start:
-            # Ensure the block fits current knowns
-            if ok_block(position, run):
-                # write this block (temporarily)
-                old = line[position:position + run]
-                for i in range(position, position + run):
-                    line[i] = 1
-                
-                # Set the inter-run gap (except after last run)
-                index_after_run = position + run
-                next_pos = index_after_run + 1
-
-                if run_idx + 1 == len(runs):
-                    # Last run: fill is done; check consistency
-                    if consistent_fill(line):
-                        yield list(line)
-                else:
-                    # Before recursing, ensure that the gap cell (position + run) is not forced to 1 by known
-                    if index_after_run < length and known[index_after_run] == 1:
-                        pass # Invalid placement (gap must be 0)
-                    else:
-                        # Make sure gap is 0
-                        if position + run < length:
-                            gap_old = line[index_after_run]
-                            line[index_after_run] = 0
-                        else:
-                            gap_old = None
-
-                        # For efficiency: if there exists a known 1 before next_pos that we didn't cover with previous blocks
-                        # this placement is invalid
-                        ok = True
-                        for i in range(pos, next_pos - 1):
-                            if known[i] == 1 and line[i] != 1:
-                                ok = False
-                                break
-                        
-                        if ok:
-                            yield from place(run_idx + 1, next_pos)
-                        
-                        # restore gap
-                        if index_after_run < length:
-                            line[index_after_run] = gap_old
-                
-                # Restore block
-                line[position:index_after_run] = old
-
-            # Move start right (skip over known 0 quickly if desired)
+            if filled_mask & ~acc_mask & ((1 << position) - 1):
+                break
+
+            bm = block << position
+            conflict = bm & empty_mask
+            if conflict:
+                position = conflict.bit_length()
+                continue
+
+            mask = acc_mask | bm
+            if last:
+                if not filled_mask & ~mask:
+                    a &= mask
+                    o |= mask
+            else:
+                a, o = place(run_idx + 1, position + run + 1, mask, a, o)
+            if not a and o == full_mask:
+                break  # Saturated: nothing left to deduce
+
             position += 1
-    
-    # Start placing first run. We can also pre-skip leading known 0
-    first_pos = 0
-    while first_pos > length and known[first_pos] == 1:
-        # If the very first cell is known 1, the first run must cover it
-        # So we leave first_pos at 0
-        break
-    yield from place(0, 0)
+
+        return a, o
+
+    return place(0, 0, 0, -1, 0)
 
 
-def deduce_from_possibilities(length: int, runs: List[int], known: List[int]) -> Tuple[List[int], List[int]]:
+@lru_cache(maxsize=1 << 16)
+def _deduce_cached(length: int, runs: Tuple[int, ...],
+                   filled_mask: int, empty_mask: int) -> Tuple[int, int]:
+    """
+    Memoized core of `deduce_from_possibilities`. Pure in its (hashable)
+    arguments, so repeated line states across passes and symmetric clues
+    are answered without re-enumerating.
+
+    Uses the compiled kernel when Numba is installed and the line fits in a
+    machine word; otherwise falls back to the pure-Python enumerator.
+    """
+    if HAVE_NUMBA and length <= MAX_KERNEL_LENGTH:
+        return kernel_deduce(length, runs, filled_mask, empty_mask)
+
+    and_of_all, or_of_all = _fold_line_patterns(length, runs, filled_mask, empty_mask)
+    if and_of_all == -1:
+        return 0, 0
+    return and_of_all, ~or_of_all & ((1 << length) - 1)
+
+
+def clear_possibility_cache() -> None:
+    """Drop memoized line deductions (call between puzzles)."""
+    _deduce_cached.cache_clear()
+
+
+def deduce_from_possibilities(runs: Sequence[int], line: LineState) -> Tuple[int, int]:
     """
     Given a line and current knowledge, enumerate all valid patterns,
-    and return two lists of indices:
+    and return two bitmasks (bit i = cell i):
         must_fill : cells that are 1 in all patterns
         must_empty: cells that are 0 in all patterns
 
-    If there are no valid patterns, both lists are empty (the caller can treat
+    If there are no valid patterns, both masks are 0 (the caller can treat
     this as a contradiction in a higher-level solver).
+
+    Results are memoized on (length, runs, filled_mask, empty_mask); the
+    tuples stored on NonogramPuzzle are used as cache keys as-is.
     """
-    patterns = list(_enumerate_line_patterns(length, runs, known))
-    if not patterns:
-        return [],  []
-    
-    # Intersect
-    len_patterns = len(patterns)
-    ones_count = [0] * length
-    for pattern in patterns:
-        for i, v in enumerate(pattern):
-            if v == 1:
-                ones_count[i] += 1
-
-    must_fill = [i for i in range(length) if ones_count[i] == len_patterns]
-    must_empty = [i for i in range(length) if ones_count[i] == 0]
-    return must_fill, must_empty
\ No newline at end of file
+    return _deduce_cached(line.length, tuple(runs), line.filled_mask, line.empty_mask)
@@ -1,11 +1,11 @@
-from typing import List
+from typing import List, Sequence, Tuple
 from .dto import NonogramPuzzle
 
 
-def _line_groups_of_ones(line: List[int]) -> List[int]:
+def _line_groups_of_ones(line: Sequence[int]) -> Tuple[int, ...]:
     """
     Convert a 0/1 line with no unknowns (-1) into run lengths of consecutive 1s.
-    Example: [0,1,1,0,1] -> [2,1]
+    Example: [0,1,1,0,1] -> (2,1)
     """
     groups = []
     run = 0
@@ -18,26 +18,49 @@ def _line_groups_of_ones(line: List[int]) -> List[int]:
                 run = 0
     if run:
         groups.append(run)
-    return groups
+    return tuple(groups)
 
 
-def is_line_fully_known(line: List[int]) -> bool:
+def _mask_groups_of_ones(mask: int) -> Tuple[int, ...]:
+    """
+    Run lengths of consecutive 1-bits of a line mask, lowest bit first.
+    Example: 0b10110 -> (2,1)
+    """
+    groups = []
+    while mask:
+        low = mask & -mask
+        # Adding the lowest set bit carries through (and clears) the lowest run
+        carried = mask + low
+        groups.append((mask & ~carried).bit_length() - low.bit_length() + 1)
+        mask &= carried
+    return tuple(groups)
+
+
+def does_mask_satisfy_clues(filled_mask: int, runs: Sequence[int]) -> bool:
+    """
+    True if the filled cells of a fully-known line (bit i = cell i) form
+    exactly the groups given by runs.
+    """
+    return _mask_groups_of_ones(filled_mask) == tuple(runs)
+
+
+def is_line_fully_known(line: Sequence[int]) -> bool:
     """True if the line has no unknowns (-1)."""
-    return all(v in (0, 1) for v in line)
+    return -1 not in line
 
 
-def does_line_satisfy_clues(line: List[int], runs: List[int]) -> bool:
+def does_line_satisfy_clues(line: Sequence[int], runs: Sequence[int]) -> bool:
     """
     True if (and only if) the line is fully known and its 1-groups equal runs.
     """
     if not is_line_fully_known(line):
         return False
-    return _line_groups_of_ones(line) == runs
+    return _line_groups_of_ones(line) == tuple(runs)
 
 
 def is_grid_complete(state: List[List[int]]) -> bool:
     """No unknowns anywhere."""
-    return all(is_line_fully_known(row) for row in state)
+    return all(-1 not in row for row in state)
 
 
 def validate_rows(puzzle: NonogramPuzzle, state: List[List[int]]) -> List[int]:
@@ -59,8 +82,8 @@ def validate_cols(puzzle: NonogramPuzzle, state: List[List[int]]) -> List[int]:
     Columns with unknowns are not counted as failures here.
     """
     bad = []
-    for c, runs in enumerate(puzzle.cols):
-        col = [state[r][c] for r in range(puzzle.size)]
+    # Transpose once instead of gathering every column cell by cell
+    for c, (runs, col) in enumerate(zip(puzzle.cols, zip(*state))):
         if is_line_fully_known(col) and not does_line_satisfy_clues(col, runs):
             bad.append(c)
     return bad
@@ -80,8 +103,7 @@ def is_puzzle_solved(puzzle: NonogramPuzzle, state: List[List[int]]) -> bool:
         if not does_line_satisfy_clues(state[r], runs):
             return False
     
-    for c, runs in enumerate(puzzle.cols):
-        col = [state[r][c] for r in range(puzzle.size)]
+    for runs, col in zip(puzzle.cols, zip(*state)):
         if not does_line_satisfy_clues(col, runs):
             return False
     